@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Content-hash cache for PDF extraction results
+Repeat uploads of the same report skip PDF parsing entirely
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def content_hasher():
+    """Incremental hasher matching content_digest, for streamed uploads"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_digest(content: bytes) -> str:
+    """Fingerprint raw PDF bytes (BLAKE2b, 128 bits)"""
+    hasher = content_hasher()
+    hasher.update(content)
+    return hasher.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Bounded LRU mapping a content key to a value
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -9,13 +9,42 @@ import os
 import re
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Union
 import pandas as pd
+from openpyxl import Workbook
 
 # Import de l'extracteur existant
 sys.path.append('/home/cag/centris-extractor')
 from extract_centris import CentrisExtractor
 
+from core.cache import ExtractionCache, content_digest
+from core.excel_export import write_sheet
+
+# Tout caractère qui n'est pas un chiffre (nettoyage des prix)
+_PRICE_NONDIGIT_RE = re.compile(r'[^\d]')
+
+# Table de str.translate supprimant tout caractère Latin-1 autre qu'un chiffre
+_DEL_NONDIGITS = str.maketrans('', '', ''.join(chr(c) for c in range(256) if not 48 <= c <= 57))
+
+# Colonnes du format ORIGINAL (dans l'ordre) et clé correspondante
+# retournée par l'extracteur existant
+_KEY_MAP = (
+    ('Centris #', 'Centris #'),
+    ('Adresse complète', 'Adresse complète'),
+    ('Quartier', 'Quartier'),
+    ('Type de propriété', 'Type de propriété'),
+    ('Prix actuel', 'Prix actuel'),
+    ('Prix original', 'Prix original'),
+    ('Propriétaire(s): nom(s) et adresse(s)', 'Propriétaire(s)'),
+    ('Représentant(s): nom(s) et adresse(s)', 'Représentant(s)'),
+    ('Courtier(s): nom(s)', 'Courtier(s): nom(s)'),
+    ('Courtier(s): téléphone(s)', 'Courtier(s): téléphone(s)'),
+    ('Courtier(s): courriel(s)', 'Courtier(s): courriel(s)'),
+)
+
+# Colonnes de prix reformatées (espaces entre les milliers et symbole $)
+_PRICE_COLUMNS = ('Prix actuel', 'Prix original')
+
 class CentrisExtractorCorrect:
     """
     Adaptateur qui utilise l'extracteur existant et retourne les données
@@ -24,14 +53,29 @@ class CentrisExtractorCorrect:
     
     def __init__(self):
         self.extractor = CentrisExtractor(validate=True, verbose=False)
+        # Résultats mis en cache selon l'empreinte du contenu du PDF
+        self.cache = ExtractionCache(maxsize=128)
     
-    def extract_to_original_format(self, pdf_path: Path) -> Tuple[List[Dict], List[Dict]]:
+    def extract_to_original_format(self, pdf_path: Path) -> Tuple[Dict[str, List], List[Dict]]:
         """
         Extrait les données du PDF et les retourne au format original attendu
         
+        Les données sont retournées par colonne (une liste de valeurs par
+        colonne du format original, dans l'ordre), prêtes pour pd.DataFrame
+        
         Returns:
-            Tuple[List[Dict], List[Dict]]: (données_extraites, erreurs)
+            Tuple[Dict[str, List], List[Dict]]: (données_extraites, erreurs)
         """
+        # Un PDF déjà traité (même contenu) est servi depuis le cache
+        try:
+            cache_key = (content_digest(Path(pdf_path).read_bytes()), "original_format")
+        except OSError:
+            cache_key = None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return self._copy_result(*cached)
+        
         # Extraction avec l'extracteur existant
         try:
             extracted_data = self.extractor.extract_from_pdf(pdf_path)
@@ -40,62 +84,74 @@ class CentrisExtractorCorrect:
                 'NomFichier': pdf_path.name,
                 'MessageErreur': f"Erreur extraction PDF: {str(e)}"
             }
-            return [], [error_record]
+            return self._empty_columns(), [error_record]
         
         if not extracted_data:
             error_record = {
                 'NomFichier': pdf_path.name,
                 'MessageErreur': "Aucune donnée extraite du PDF"
             }
-            return [], [error_record]
+            return self._empty_columns(), [error_record]
         
-        # Format ORIGINAL : retourner les données telles quelles car l'extracteur
-        # original retourne déjà le bon format avec les 11 colonnes
-        formatted_data = []
-        errors = []
+        # Format ORIGINAL : l'extracteur original retourne déjà les 11 colonnes,
+        # seuls les noms de certaines clés et le format des prix changent
+        try:
+            # Format des prix pour correspondre exactement au format attendu
+            formatted_data = {
+                column: [self._format_price(property_data.get(key, '')) for property_data in extracted_data]
+                if column in _PRICE_COLUMNS else
+                [property_data.get(key, '') for property_data in extracted_data]
+                for column, key in _KEY_MAP
+            }
+            errors = []
+        except Exception:
+            # Cas rare : reprendre propriété par propriété pour isoler les erreurs
+            formatted_data = self._empty_columns()
+            errors = []
+            for property_data in extracted_data:
+                try:
+                    formatted_record = self._format_record(property_data)
+                    for column, values in formatted_data.items():
+                        values.append(formatted_record[column])
+                except Exception as e:
+                    error_record = {
+                        'NomFichier': pdf_path.name,
+                        'Centris #': property_data.get('Centris #', 'N/A'),
+                        'MessageErreur': f"Erreur formatage: {str(e)}"
+                    }
+                    errors.append(error_record)
         
-        for property_data in extracted_data:
-            try:
-                # L'extracteur original retourne déjà le format avec ces colonnes :
-                # - Centris #
-                # - Adresse complète
-                # - Quartier
-                # - Type de propriété
-                # - Prix actuel
-                # - Prix original
-                # - Propriétaire(s)
-                # - Représentant(s)
-                # - Courtier(s): nom(s)
-                # - Courtier(s): téléphone(s)
-                # - Courtier(s): courriel(s)
-                
-                # Format des prix pour correspondre exactement au format attendu
-                formatted_record = {
-                    'Centris #': property_data.get('Centris #', ''),
-                    'Adresse complète': property_data.get('Adresse complète', ''),
-                    'Quartier': property_data.get('Quartier', ''),
-                    'Type de propriété': property_data.get('Type de propriété', ''),
-                    'Prix actuel': self._format_price(property_data.get('Prix actuel', '')),
-                    'Prix original': self._format_price(property_data.get('Prix original', '')),
-                    'Propriétaire(s): nom(s) et adresse(s)': property_data.get('Propriétaire(s)', ''),
-                    'Représentant(s): nom(s) et adresse(s)': property_data.get('Représentant(s)', ''),
-                    'Courtier(s): nom(s)': property_data.get('Courtier(s): nom(s)', ''),
-                    'Courtier(s): téléphone(s)': property_data.get('Courtier(s): téléphone(s)', ''),
-                    'Courtier(s): courriel(s)': property_data.get('Courtier(s): courriel(s)', '')
-                }
-                
-                formatted_data.append(formatted_record)
-                
-            except Exception as e:
-                error_record = {
-                    'NomFichier': pdf_path.name,
-                    'Centris #': property_data.get('Centris #', 'N/A'),
-                    'MessageErreur': f"Erreur formatage: {str(e)}"
-                }
-                errors.append(error_record)
+        if cache_key is not None:
+            self.cache.set(cache_key, self._copy_result(formatted_data, errors))
         
         return formatted_data, errors
     
+    def _copy_result(self, formatted_data: Dict[str, List], errors: List[Dict]) -> Tuple[Dict[str, List], List[Dict]]:
+        """
+        Copie indépendante d'un résultat, pour que l'appelant ne puisse pas
+        modifier l'entrée du cache
+        """
+        return (
+            {column: list(values) for column, values in formatted_data.items()},
+            [dict(error) for error in errors]
+        )
+    
+    def _empty_columns(self) -> Dict[str, List]:
+        """Colonnes du format original, sans données"""
+        return {column: [] for column, _ in _KEY_MAP}
+    
+    def _format_record(self, property_data: Dict) -> Dict:
+        """
+        Construit un enregistrement au format original à partir d'une propriété
+        """
+        formatted_record = {column: property_data.get(key, '') for column, key in _KEY_MAP}
+        
+        # Format des prix pour correspondre exactement au format attendu
+        for column in _PRICE_COLUMNS:
+            formatted_record[column] = self._format_price(formatted_record[column])
+        
+        return formatted_record
+    
     def _format_price(self, price_str: str) -> str:
         """
         Formate le prix pour correspondre exactement au format attendu
@@ -109,7 +165,10 @@ class CentrisExtractorCorrect:
             return price_str
         
         # Extraire uniquement les chiffres
-        price_digits = re.sub(r'[^\d]', '', price_str)
+        price_digits = price_str.translate(_DEL_NONDIGITS)
+        if not price_digits.isdecimal():
+            # Caractères hors Latin-1 restants : repli sur l'expression régulière
+            price_digits = _PRICE_NONDIGIT_RE.sub('', price_digits)
         
         if not price_digits:
             return price_str  # Retourner tel quel si pas de chiffres
@@ -126,57 +185,37 @@ class CentrisExtractorCorrect:
         except ValueError:
             return price_str  # Retourner tel quel en cas d'erreur
     
-    def export_to_xlsx_original(self, data: List[Dict], errors: List[Dict], output_path: Path):
+    def export_to_xlsx_original(self, data: Union[Dict[str, List], List[Dict]], errors: List[Dict], output_path: Path):
         """
         Exporte les données au format XLSX avec les colonnes originales attendues
+        
+        Accepte les données par colonne (extract_to_original_format) ou une
+        liste d'enregistrements
         """
         try:
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                # Feuille principale avec les données
-                if data:
-                    df_data = pd.DataFrame(data)
-                    
-                    # S'assurer que les colonnes sont dans le bon ordre
-                    columns_order = [
-                        'Centris #',
-                        'Adresse complète',
-                        'Quartier',
-                        'Type de propriété',
-                        'Prix actuel',
-                        'Prix original',
-                        'Propriétaire(s): nom(s) et adresse(s)',
-                        'Représentant(s): nom(s) et adresse(s)',
-                        'Courtier(s): nom(s)',
-                        'Courtier(s): téléphone(s)',
-                        'Courtier(s): courriel(s)'
-                    ]
-                    
-                    # Réorganiser les colonnes
-                    df_data = df_data.reindex(columns=columns_order, fill_value='')
-                    
-                    # Exporter sans nom de feuille spécifique pour matcher le format attendu
-                    df_data.to_excel(writer, index=False)
-                    
-                    # Ajustement des largeurs de colonnes
-                    worksheet = writer.sheets['Sheet1']
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column_letter = column[0].column_letter
-                        
-                        for cell in column:
-                            try:
-                                if cell.value and len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        
-                        adjusted_width = min(max_length + 2, 60)  # Max 60 caractères
-                        worksheet.column_dimensions[column_letter].width = adjusted_width
-                
-                # Feuille d'erreurs si nécessaire
-                if errors:
-                    df_errors = pd.DataFrame(errors)
-                    df_errors.to_excel(writer, sheet_name='Erreurs', index=False)
+            workbook = Workbook(write_only=True)
+            
+            # S'assurer que les colonnes sont dans le bon ordre
+            columns_order = [column for column, _ in _KEY_MAP]
+            
+            # Réorganiser les colonnes
+            df_data = pd.DataFrame(data).reindex(columns=columns_order, fill_value='')
+            
+            # Feuille principale avec les données
+            if not df_data.empty:
+                # Nom de feuille par défaut pour matcher le format attendu,
+                # largeurs ajustées au contenu (max 60 caractères)
+                write_sheet(workbook, 'Sheet1', df_data, max_width=60)
+            
+            # Feuille d'erreurs si nécessaire
+            if errors:
+                df_errors = pd.DataFrame(errors)
+                write_sheet(workbook, 'Erreurs', df_errors)
+            
+            if not workbook.worksheets:
+                raise ValueError("Aucune donnée à exporter")
+            
+            workbook.save(output_path)
             
             return True
         except Exception as e:
@@ -201,12 +240,13 @@ def test_extraction():
     # Extraction
     data, errors = extractor.extract_to_original_format(pdf_path)
     
-    print(f"✅ Extraction terminée: {len(data)} propriétés, {len(errors)} erreurs")
+    property_count = len(data['Centris #'])
+    print(f"✅ Extraction terminée: {property_count} propriétés, {len(errors)} erreurs")
     
-    if data:
+    if property_count:
         print("\n📋 Aperçu de la première propriété:")
-        first = data[0]
-        for key, value in first.items():
+        for key, values in data.items():
+            value = values[0]
             if value:  # N'afficher que les valeurs non vides
                 print(f"   {key}: {value[:80]}..." if len(str(value)) > 80 else f"   {key}: {value}")
     
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Streaming Excel helpers for Centris exports
+Rows are written through openpyxl's write-only mode instead of the full
+in-memory workbook built by pandas.ExcelWriter
+"""
+
+from typing import List, Optional
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+
+def column_widths(df: pd.DataFrame, max_width: int) -> List[int]:
+    """Fit each column to its longest value (header included), capped at max_width"""
+    widths = []
+    for column in df.columns:
+        lengths = df[column].dropna().astype(str).str.len()
+        longest = max(int(lengths.max()) if len(lengths) else 0, len(str(column)))
+        widths.append(min(longest + 2, max_width))
+    return widths
+
+
+def write_sheet(workbook: Workbook, title: str, df: pd.DataFrame,
+                max_width: Optional[int] = None):
+    """
+    Append a sheet with the DataFrame contents to a write-only workbook
+
+    Column widths have to be set before the first row is written, so they
+    are computed up front from the DataFrame when max_width is given.
+    """
+    worksheet = workbook.create_sheet(title)
+
+    if max_width is not None:
+        for i, width in enumerate(column_widths(df, max_width), 1):
+            worksheet.column_dimensions[get_column_letter(i)].width = width
+
+    # Missing values become empty cells, as with DataFrame.to_excel
+    values = df.astype(object).where(df.notna(), None)
+
+    worksheet.append([str(column) for column in df.columns])
+    for row in values.itertuples(index=False, name=None):
+        worksheet.append(row)
+
+    return worksheet
@@ -4,17 +4,88 @@ Simple PDF extractor for Centris data
 Standalone version that doesn't depend on external paths
 """
 
-import pdfplumber
+import mmap
 import re
-from typing import List, Dict, Any
+from contextlib import contextmanager
+from pypdf import PdfReader
+from typing import List, Dict, Any, BinaryIO, Iterator, Union
 from pathlib import Path
 
-def extract_pdf_data(pdf_path: str) -> List[Dict[str, Any]]:
+try:
+    # RE2 matches in linear time, so no input can trigger catastrophic
+    # backtracking. It is not faster than re on this pattern.
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
+
+# Basic patterns for extracting property information
+# These patterns can be improved based on actual Centris PDF format
+
+# Whitespace as pypdf emits it, including the no-break and narrow no-break
+# spaces used as thousands separators in French-Canadian amounts. Spelled out
+# (with [0-9] for digits) because RE2's \s and \d are ASCII-only while the
+# stdlib's are Unicode-aware, and both engines must match the same text.
+_SPACE_CHARS = '\t\n\f\r \xa0\u202f'
+
+# Thousands separators: horizontal only, so an amount never runs onto the
+# next line (e.g. into the street number of an address)
+_THOUSANDS_SEP_CHARS = ' \xa0\u202f,'
+
+# Single-pass scanner over the full text, dispatching on the named group:
+# - addr: common Quebec address patterns ("<no> rue ..., <city>"), with
+#   street and city lengths bounded to cap the work done per match attempt
+#   (only this branch is bounded: under the stdlib fallback the price
+#   branch's leading whitespace run still makes long blank runs quadratic)
+# - price: dollar amounts with at least one thousands group, ending on a
+#   word boundary so a match cannot stop partway through a longer number
+#   (RE2 has no lookahead, so \b stands in for (?![0-9]))
+# - type: property types
+_COMBINED_PATTERN = (
+    rf"(?i)(?P<addr>(?P<street>[0-9]+[A-Za-z]?[{_SPACE_CHARS}]+(?:rue|avenue|boulevard|chemin|place)"
+    rf"[{_SPACE_CHARS}]+[A-Za-z{_SPACE_CHARS}\-']{{1,60}}?),[{_SPACE_CHARS}]*"
+    rf"(?P<city>[A-Za-z][A-Za-z{_SPACE_CHARS}\-']{{0,40}}))"
+    rf"|(?P<price>\$?[{_SPACE_CHARS}]*(?P<amount>[0-9]{{1,3}}(?:[{_THOUSANDS_SEP_CHARS}][0-9]{{3}})+\b)[{_SPACE_CHARS}]*\$?)"
+    r"|(?P<type>condo|maison|duplex|triplex|cottage|bungalow|appartement)"
+)
+
+def _compile_scanner(engine):
+    """Compile the scanner with RE2 or the stdlib re (ASCII case folding, like RE2)"""
+    if engine is re:
+        return re.compile(_COMBINED_PATTERN, re.ASCII)
+    return engine.compile(_COMBINED_PATTERN)
+
+_COMBINED_RE = _compile_scanner(regex_engine)
+
+# Property type of the entry returned in place of data when extraction fails
+EXTRACTION_ERROR_TYPE = "Erreur"
+
+# Non-digit characters, stripped when cleaning prices
+_PRICE_NONDIGIT_RE = re.compile(r'[^\d]')
+
+@contextmanager
+def _mapped_pdf(pdf_path: Union[str, Path]) -> Iterator[mmap.mmap]:
+    """Memory-map a PDF file read-only, so pages are read on demand without a copy"""
+    with open(pdf_path, 'rb') as pdf_file:
+        with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf_map:
+            yield pdf_map
+
+def _extract_pages(reader: PdfReader) -> str:
+    """Extract plain text from all pages (no layout analysis needed for regex scanning)"""
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+def _extract_full_text(pdf_source: Union[str, Path, BinaryIO]) -> str:
+    """Extract plain text from a PDF path (memory-mapped) or binary stream"""
+    if isinstance(pdf_source, (str, Path)):
+        with _mapped_pdf(pdf_source) as pdf_map:
+            return _extract_pages(PdfReader(pdf_map))
+    return _extract_pages(PdfReader(pdf_source))
+
+def extract_pdf_data(pdf_source: Union[str, Path, BinaryIO]) -> List[Dict[str, Any]]:
     """
     Extract real estate data from Centris PDF
     
     Args:
-        pdf_path: Path to the PDF file
+        pdf_source: Path to the PDF file, or a binary file-like object
         
     Returns:
         List of dictionaries containing extracted property data
@@ -22,77 +93,68 @@ def extract_pdf_data(pdf_path: str) -> List[Dict[str, Any]]:
     properties = []
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            full_text = ""
-            
-            # Extract text from all pages
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    full_text += page_text + "\n"
-            
-            # Basic patterns for extracting property information
-            # These patterns can be improved based on actual Centris PDF format
-            
-            # Extract addresses - look for common Quebec address patterns
-            address_pattern = r'(\d+[A-Za-z]?\s+(?:rue|avenue|boulevard|chemin|place)\s+[A-Za-z\s\-\']+),?\s*([A-Za-z\s\-\']+)'
-            addresses = re.findall(address_pattern, full_text, re.IGNORECASE)
+        full_text = _extract_full_text(pdf_source)
+        
+        # Extract addresses, prices and property types in a single pass
+        addresses = []
+        prices = []
+        types = []
+        for match in _COMBINED_RE.finditer(full_text):
+            kind = match.lastgroup
+            if kind == "addr":
+                addresses.append((match.group("street"), match.group("city")))
+            elif kind == "price":
+                prices.append(match.group("amount"))
+            else:
+                types.append(match.group("type"))
+        
+        # Try to match addresses with prices and types
+        for i, (street, city) in enumerate(addresses[:10]):  # Limit to first 10 properties
+            property_data = {
+                "address": f"{street.strip()}, {city.strip()}",
+                "price": f"{prices[i] if i < len(prices) else 'N/A'}$",
+                "type": types[i].title() if i < len(types) else "Propriété",
+                "city": city.strip(),
+                "street": street.strip()
+            }
+            properties.append(property_data)
+        
+        # If no structured data found, create sample data to show extraction worked
+        if not properties:
+            # Look for any dollar amounts and addresses separately
+            sample_addresses = [
+                "Adresse extraite du PDF",
+                "Propriété identifiée", 
+                "Bien immobilier trouvé"
+            ]
             
-            # Extract prices - look for dollar amounts
-            price_pattern = r'\$?\s*(\d{1,3}(?:[\s,]\d{3})*)\s*\$?'
-            prices = re.findall(price_pattern, full_text)
+            sample_prices = []
+            for price in prices[:3]:
+                # Clean price format
+                clean_price = _PRICE_NONDIGIT_RE.sub('', str(price))
+                if clean_price and len(clean_price) >= 4:
+                    formatted_price = f"{int(clean_price):,}$".replace(',', ' ')
+                    sample_prices.append(formatted_price)
             
-            # Extract property types
-            type_pattern = r'(condo|maison|duplex|triplex|cottage|bungalow|appartement)'
-            types = re.findall(type_pattern, full_text, re.IGNORECASE)
+            if not sample_prices:
+                sample_prices = ["Prix à déterminer", "Voir document", "Contact requis"]
             
-            # Try to match addresses with prices and types
-            for i, (street, city) in enumerate(addresses[:10]):  # Limit to first 10 properties
+            for i in range(min(len(sample_addresses), 3)):
                 property_data = {
-                    "address": f"{street.strip()}, {city.strip()}",
-                    "price": f"{prices[i] if i < len(prices) else 'N/A'}$",
-                    "type": types[i].title() if i < len(types) else "Propriété",
-                    "city": city.strip(),
-                    "street": street.strip()
+                    "address": sample_addresses[i],
+                    "price": sample_prices[i] if i < len(sample_prices) else "Prix N/A",
+                    "type": "Propriété extraite",
+                    "city": "Ville détectée",
+                    "street": f"Rue {i+1}"
                 }
                 properties.append(property_data)
-            
-            # If no structured data found, create sample data to show extraction worked
-            if not properties:
-                # Look for any dollar amounts and addresses separately
-                sample_addresses = [
-                    "Adresse extraite du PDF",
-                    "Propriété identifiée", 
-                    "Bien immobilier trouvé"
-                ]
-                
-                sample_prices = []
-                for price in prices[:3]:
-                    # Clean price format
-                    clean_price = re.sub(r'[^\d]', '', str(price))
-                    if clean_price and len(clean_price) >= 4:
-                        formatted_price = f"{int(clean_price):,}$".replace(',', ' ')
-                        sample_prices.append(formatted_price)
-                
-                if not sample_prices:
-                    sample_prices = ["Prix à déterminer", "Voir document", "Contact requis"]
-                
-                for i in range(min(len(sample_addresses), 3)):
-                    property_data = {
-                        "address": sample_addresses[i],
-                        "price": sample_prices[i] if i < len(sample_prices) else "Prix N/A",
-                        "type": "Propriété extraite",
-                        "city": "Ville détectée",
-                        "street": f"Rue {i+1}"
-                    }
-                    properties.append(property_data)
     
     except Exception as e:
         # Return error information as a property entry
         properties.append({
             "address": f"Erreur lors de l'extraction: {str(e)}",
             "price": "N/A",
-            "type": "Erreur",
+            "type": EXTRACTION_ERROR_TYPE,
             "city": "N/A",
             "street": "N/A"
         })
@@ -100,12 +162,17 @@ def extract_pdf_data(pdf_path: str) -> List[Dict[str, Any]]:
     return properties
 
 
-def extract_centris_detailed(pdf_path: str) -> Dict[str, Any]:
+def is_extraction_error(properties: List[Dict[str, Any]]) -> bool:
+    """True when extract_pdf_data returned an error entry instead of data"""
+    return any(prop.get("type") == EXTRACTION_ERROR_TYPE for prop in properties)
+
+
+def extract_centris_detailed(pdf_source: Union[str, Path, BinaryIO]) -> Dict[str, Any]:
     """
     More detailed extraction with metadata
     
     Args:
-        pdf_path: Path to the PDF file
+        pdf_source: Path to the PDF file, or a binary file-like object
         
     Returns:
         Dictionary with extraction results and metadata
@@ -113,15 +180,15 @@ def extract_centris_detailed(pdf_path: str) -> Dict[str, Any]:
     
     result = {
         "success": False,
-        "filename": Path(pdf_path).name,
+        "filename": Path(pdf_source).name if isinstance(pdf_source, (str, Path)) else getattr(pdf_source, "name", ""),
         "total_properties": 0,
         "properties": [],
-        "extraction_method": "pdfplumber",
+        "extraction_method": "pypdf",
         "errors": []
     }
     
     try:
-        properties = extract_pdf_data(pdf_path)
+        properties = extract_pdf_data(pdf_source)
         result["properties"] = properties
         result["total_properties"] = len(properties)
         result["success"] = True
@@ -134,6 +201,6 @@ def extract_centris_detailed(pdf_path: str) -> Dict[str, Any]:
 
 
 # For backward compatibility with the FastAPI main.py
-def extract_pdf_data_wrapper(pdf_path: str) -> List[Dict[str, Any]]:
+def extract_pdf_data_wrapper(pdf_source: Union[str, Path, BinaryIO]) -> List[Dict[str, Any]]:
     """Wrapper function for main.py compatibility"""
-    return extract_pdf_data(pdf_path)
\ No newline at end of file
+    return extract_pdf_data(pdf_source)
\ No newline at end of file
@@ -6,22 +6,98 @@ Provides PDF extraction endpoints for the Next.js frontend
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import pandas as pd
+from openpyxl import Workbook
+from pypdf import PdfWriter
+import asyncio
 import io
-import json
-from typing import List, Dict, Any
-import tempfile
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import BinaryIO, Iterator, List, Dict, Any
 import os
+import tempfile
 from pathlib import Path
 
 # Import our extraction logic
-from core.pdf_extractor import extract_pdf_data_wrapper as extract_pdf_data
+from core.pdf_extractor import extract_pdf_data_wrapper as extract_pdf_data, is_extraction_error
+from core.cache import ExtractionCache, content_hasher
+from core.excel_export import write_sheet
+
+# Extraction results keyed by PDF content hash (repeat uploads skip parsing)
+extraction_cache = ExtractionCache(maxsize=128)
+
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1 << 20
+EXPORT_SPOOL_SIZE = 4 << 20
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson (faster than the stdlib encoder)"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+def iter_file_chunks(file_obj: BinaryIO, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a file's content in fixed-size chunks, closing it once exhausted"""
+    try:
+        while chunk := file_obj.read(chunk_size):
+            yield chunk
+    finally:
+        file_obj.close()
+
+def build_excel_file(properties: List[Dict[str, Any]]) -> BinaryIO:
+    """Write properties to an XLSX file, returned rewound and ready to stream"""
+    # Convert to DataFrame
+    df = pd.DataFrame(properties)
+    
+    # Stream rows into a write-only workbook
+    workbook = Workbook(write_only=True)
+    write_sheet(workbook, 'Centris Data', df, max_width=50)
+    
+    # Small exports stay in memory, large ones spill to disk
+    excel_file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    try:
+        workbook.save(excel_file)
+    except Exception:
+        excel_file.close()
+        raise
+    excel_file.seek(0)
+    return excel_file
+
+def warm_up_pipeline():
+    """
+    Run a tiny extraction and export once so lazy imports and caches
+    (pypdf filters, openpyxl writers) are loaded before serving traffic
+    """
+    pdf_buffer = io.BytesIO()
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    writer.write(pdf_buffer)
+    pdf_buffer.seek(0)
+    extract_pdf_data(pdf_buffer)
+    
+    workbook = Workbook(write_only=True)
+    write_sheet(workbook, 'Warm-up', pd.DataFrame([{"address": ""}]), max_width=50)
+    workbook.save(io.BytesIO())
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bounded pool for CPU-bound work offloaded with asyncio.to_thread
+    executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="extraction")
+    asyncio.get_running_loop().set_default_executor(executor)
+    
+    await asyncio.to_thread(warm_up_pipeline)
+    yield
+    
+    executor.shutdown(wait=False)
 
 app = FastAPI(
     title="Centris Extractor API",
     description="API for extracting real estate data from Centris PDF files",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS for Next.js frontend
@@ -63,6 +139,16 @@ async def health_check():
         "max_file_size": "10MB"
     }
 
+def build_extraction_response(filename: str, extracted_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Format the /extract-pdf response payload"""
+    return {
+        "success": True,
+        "filename": filename,
+        "total_properties": len(extracted_data) if extracted_data else 0,
+        "properties": extracted_data or [],
+        "message": f"Successfully extracted {len(extracted_data) if extracted_data else 0} properties"
+    }
+
 @app.post("/extract-pdf")
 async def extract_pdf(file: UploadFile = File(...)):
     """
@@ -77,45 +163,48 @@ async def extract_pdf(file: UploadFile = File(...)):
             )
         
         # Check file size (10MB limit)
-        if file.size and file.size > 10 * 1024 * 1024:
+        if file.size and file.size > MAX_UPLOAD_SIZE:
             raise HTTPException(
                 status_code=413,
                 detail="File too large. Maximum size is 10MB"
             )
         
-        # Read file content
-        pdf_content = await file.read()
+        # Read upload in chunks into memory, hashing as we go
+        hasher = content_hasher()
+        total_size = 0
+        pdf_buffer = io.BytesIO()
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total_size += len(chunk)
+            if total_size > MAX_UPLOAD_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail="File too large. Maximum size is 10MB"
+                )
+            hasher.update(chunk)
+            pdf_buffer.write(chunk)
+        pdf_buffer.seek(0)
         
-        # Save to temporary file for processing
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            temp_file.write(pdf_content)
-            temp_file_path = temp_file.name
+        # Serve repeat uploads straight from the cache
+        digest = hasher.hexdigest()
+        cached_data = extraction_cache.get(digest)
+        if cached_data is not None:
+            return ORJSONResponse(build_extraction_response(file.filename, cached_data))
         
         try:
-            # Extract data using our Python script
-            extracted_data = extract_pdf_data(temp_file_path)
-            
-            # Format response
-            response = {
-                "success": True,
-                "filename": file.filename,
-                "total_properties": len(extracted_data) if extracted_data else 0,
-                "properties": extracted_data or [],
-                "message": f"Successfully extracted {len(extracted_data) if extracted_data else 0} properties"
-            }
-            
-            return JSONResponse(content=response)
-            
+            # Extract data using our Python script, straight from memory,
+            # off the event loop
+            extracted_data = await asyncio.to_thread(extract_pdf_data, pdf_buffer)
         except Exception as extraction_error:
             raise HTTPException(
                 status_code=422,
                 detail=f"Failed to extract data from PDF: {str(extraction_error)}"
             )
         
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        # Failures may be transient (e.g. MemoryError): only cache real data
+        if not is_extraction_error(extracted_data):
+            extraction_cache.set(digest, extracted_data)
+        
+        return ORJSONResponse(build_extraction_response(file.filename, extracted_data))
     
     except HTTPException:
         raise
@@ -140,35 +229,12 @@ async def export_excel(data: Dict[str, Any]):
                 detail="No data provided for export"
             )
         
-        # Convert to DataFrame
-        df = pd.DataFrame(properties)
-        
-        # Create Excel file in memory
-        excel_buffer = io.BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Centris Data')
-            
-            # Auto-adjust column widths
-            worksheet = writer.sheets['Centris Data']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        excel_buffer.seek(0)
-        
-        # Return file response
-        from fastapi.responses import StreamingResponse
+        # Build the workbook off the event loop
+        excel_file = await asyncio.to_thread(build_excel_file, properties)
         
+        # Return file response, streamed straight from the spooled file
         return StreamingResponse(
-            io.BytesIO(excel_buffer.read()),
+            iter_file_chunks(excel_file),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={
                 "Content-Disposition": f"attachment; filename={filename.replace('.pdf', '.xlsx')}"
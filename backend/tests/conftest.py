@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the backend the same way main.py does (from core.xxx import ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,60 @@
+import re
+
+import pytest
+
+from core.pdf_extractor import _compile_scanner
+
+# French-Canadian text as pypdf emits it: no-break (\xa0) and narrow
+# no-break (\u202f) spaces as thousands separators and inside addresses
+SAMPLE_TEXT = (
+    "Condo à vendre\n"
+    "1234 rue Saint-Denis, Montreal\n"
+    "Prix demandé : 350\xa0000 $\n"
+    "56\xa0avenue\xa0du Parc, Laval\n"
+    "Prix original : 1\u202f200\u202f000 $\n"
+    "Duplex 1,250,000 $ 42"
+)
+
+EXPECTED_MATCHES = [
+    ("type", "Condo"),
+    ("addr", "1234 rue Saint-Denis"),
+    ("price", "350\xa0000"),
+    ("addr", "56\xa0avenue\xa0du Parc"),
+    ("price", "1\u202f200\u202f000"),
+    ("type", "Duplex"),
+    ("price", "1,250,000"),
+]
+
+# Group holding the extracted value for each kind of match
+VALUE_GROUPS = {"addr": "street", "price": "amount", "type": "type"}
+
+
+def scan(engine):
+    return [
+        (m.lastgroup, m.group(VALUE_GROUPS[m.lastgroup]))
+        for m in _compile_scanner(engine).finditer(SAMPLE_TEXT)
+    ]
+
+
+def test_stdlib_scanner_matches_nbsp_separators():
+    assert scan(re) == EXPECTED_MATCHES
+
+
+def test_re2_scanner_matches_stdlib():
+    re2 = pytest.importorskip("re2")
+    assert scan(re2) == scan(re)
+
+
+@pytest.mark.parametrize("text, street", [
+    ("Prix 350 000\n1234 rue Saint-Denis, Montreal", "1234 rue Saint-Denis"),
+    ("Prix: 350 000\n123 rue Saint-Denis, Montreal", "123 rue Saint-Denis"),
+    ("Prix 350 000 1234 rue Saint-Denis, Montreal", "1234 rue Saint-Denis"),
+])
+@pytest.mark.parametrize("engine_name", ["re", "re2"])
+def test_price_without_dollar_does_not_eat_next_address(text, street, engine_name):
+    engine = re if engine_name == "re" else pytest.importorskip("re2")
+    matches = [
+        (m.lastgroup, m.group(VALUE_GROUPS[m.lastgroup]))
+        for m in _compile_scanner(engine).finditer(text)
+    ]
+    assert matches == [("price", "350 000"), ("addr", street)]